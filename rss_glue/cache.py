@@ -1,7 +1,9 @@
 import json
 import os
+import uuid
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Any, Optional, Protocol
+from typing import IO, Any, Iterable, Iterator, Optional, Protocol
 
 
 class SimpleCache(Protocol):
@@ -18,15 +20,26 @@ class SimpleCache(Protocol):
         pass
 
 
-class FileCache:
+class NamespaceDirectories:
+    """
+    A directory under root for each namespace
+    """
+
     def __init__(self, root: Path):
         self.root = root
+        self._namespaces: dict[str, Path] = {}
 
     def _ensure_namespace(self, namespace: str) -> Path:
-        parent = self.root / namespace.replace(os.sep, "_")
-        parent.mkdir(parents=True, exist_ok=True)
+        # Every cache operation goes through here, so only create each directory once
+        parent = self._namespaces.get(namespace)
+        if parent is None:
+            parent = self.root / namespace.replace(os.sep, "_")
+            parent.mkdir(parents=True, exist_ok=True)
+            self._namespaces[namespace] = parent
         return parent
 
+
+class FileCache(NamespaceDirectories):
     def getPath(self, key: str, ext: str, namespace: str) -> Path:
         pathsafe_key = key.replace(os.sep, "_")
         return self._ensure_namespace(namespace) / f"{pathsafe_key}.{ext}"
@@ -36,24 +49,55 @@ class FileCache:
         relpath = Path(namespace.replace(os.sep, "_")) / f"{pathsafe_key}.{ext}"
         return relpath
 
+    @contextmanager
+    def _replace(self, path: Path, mode: str, **kwargs) -> Iterator[IO]:
+        """
+        Open a temporary file that replaces path once it has been written completely,
+        so readers such as the web server never see a partially written file
+        """
+        # A unique name, so processes writing the same file don't share a temporary file
+        tmp_path = path.with_name(f".{path.name}.{uuid.uuid4().hex}.tmp")
+        try:
+            with open(tmp_path, mode, **kwargs) as f:
+                yield f
+            os.replace(tmp_path, path)
+        except BaseException:
+            tmp_path.unlink(missing_ok=True)
+            raise
+
     def write(self, key: str, ext: str, data: str, namespace: str) -> Path:
-        with open(self.getPath(key, ext, namespace), "w") as f:
+        with self._replace(self.getPath(key, ext, namespace), "w", encoding="utf-8") as f:
             f.write(data)
         return self.getRelativePath(key, ext, namespace)
 
-    def nsFiles(self, ext: str, namespace: str) -> list[Path]:
-        return list(self._ensure_namespace(namespace).glob(f"*.{ext}"))
+    def write_bytes(self, key: str, ext: str, data: bytes, namespace: str) -> Path:
+        with self._replace(self.getPath(key, ext, namespace), "wb") as f:
+            f.write(data)
+        return self.getRelativePath(key, ext, namespace)
+
+    def write_chunks(self, key: str, ext: str, chunks: Iterable[str], namespace: str) -> Path:
+        """
+        Write the file a piece at a time, so it never has to be held in memory whole
+        """
+        path = self.getPath(key, ext, namespace)
+        with self._replace(path, "w", encoding="utf-8", buffering=64 * 1024) as f:
+            f.writelines(chunks)
+        return self.getRelativePath(key, ext, namespace)
 
+    def write_stream(self, key: str, ext: str, chunks: Iterable[bytes], namespace: str) -> Path:
+        """
+        Write binary chunks, such as a download, without holding them in memory whole
+        """
+        with self._replace(self.getPath(key, ext, namespace), "wb") as f:
+            for chunk in chunks:
+                f.write(chunk)
+        return self.getRelativePath(key, ext, namespace)
 
-class JsonCache(SimpleCache):
-    def __init__(self, root: Path):
-        self.root = root
+    def nsFiles(self, ext: str, namespace: str) -> list[Path]:
+        return list(self._ensure_namespace(namespace).glob(f"*.{ext}"))
 
-    def _ensure_namespace(self, namespace: str) -> Path:
-        parent = self.root / namespace.replace(os.sep, "_")
-        parent.mkdir(parents=True, exist_ok=True)
-        return parent
 
+class JsonCache(NamespaceDirectories, SimpleCache):
     def cacheFile(self, key: str, namespace: str) -> Path:
         pathsafe_key = key.replace(os.sep, "_")
         return self._ensure_namespace(namespace) / f"{pathsafe_key}.json"
@@ -72,5 +116,11 @@ class JsonCache(SimpleCache):
         os.remove(self.cacheFile(key, namespace))
 
     def keys(self, namespace: str) -> list[str]:
-        all_keys = [f.stem for f in self._ensure_namespace(namespace).glob("*.json")]
-        return [key for key in all_keys if key != "meta"]
+        # scandir reads names straight from the directory listing, without building
+        # a Path and matching a glob for every entry
+        with os.scandir(self._ensure_namespace(namespace)) as entries:
+            return [
+                entry.name[:-5]
+                for entry in entries
+                if entry.name.endswith(".json") and entry.name != "meta.json"
+            ]
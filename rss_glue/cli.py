@@ -3,7 +3,7 @@ import random as rand
 import traceback
 from datetime import timedelta
 from time import sleep
-from typing import Set
+from typing import Optional, Set
 from urllib.parse import urljoin
 
 import click
@@ -11,6 +11,7 @@ import click
 from rss_glue.feeds import feed
 from rss_glue.logger import logger
 from rss_glue.outputs import Artifact, artifact
+from rss_glue.outputs.artifact import RenderedPosts
 from rss_glue.resources import global_config, utc_now
 
 
@@ -30,9 +31,11 @@ def _collect_sources(artifacts: list["artifact.Artifact"]) -> list[feed.BaseFeed
     return sorted
 
 
-def _generate(artifact: "artifact.Artifact", force: bool = False):
+def _generate(
+    artifact: "artifact.Artifact", force: bool = False, rendered: Optional[RenderedPosts] = None
+):
     now = utc_now()
-    for path, modified in artifact.generate():
+    for path, modified in artifact.generate(rendered):
         if modified > now:
             full_url = urljoin(global_config.base_url, path.as_posix())
             logger.info(f" generated {full_url}")
@@ -42,7 +45,8 @@ def _update(artifacts: list["artifact.Artifact"], force: bool, limit: list[str]
     sources = _collect_sources(artifacts)
     if len(limit):
         logger.info(f" updating {len(limit)} sources")
-        sources = [source for source in sources if source.namespace in limit]
+        allowed = frozenset(limit)
+        sources = [source for source in sources if source.namespace in allowed]
     else:
         logger.info(f" discovered {len(sources)} sources")
 
@@ -57,9 +61,11 @@ def _update(artifacts: list["artifact.Artifact"], force: bool, limit: list[str]
             logger.critical(f" Source {source.namespace} failed to update: {e}")
             logger.critical(traceback.format_exc())
 
+    # Posts rendered by one artifact are reused by the others in this pass
+    rendered = RenderedPosts()
     for artifact in artifacts:
         try:
-            _generate(artifact)
+            _generate(artifact, rendered=rendered)
         except Exception as e:
             logger.critical(f" Artifact failed to generate: {e}")
             logger.critical(traceback.format_exc())
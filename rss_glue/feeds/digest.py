@@ -32,15 +32,15 @@ class DigestPost(feed.FeedItem):
     subposts: list[feed.FeedItem]
 
     def render(self):
-        html = ""
-        for post in self.subposts:
-            html += digetst_post_template.format(
+        return "".join(
+            digetst_post_template.format(
                 title=post.title,
                 content=post.render(),
-                posted_time=post.posted_time.strftime(utils.human_strftime),
+                posted_time=utils.human_time(post.posted_time),
                 origin_url=post.origin_url,
             )
-        return html
+            for post in self.subposts
+        )
 
     def to_dict(self) -> dict:
         d = super().to_dict()
@@ -132,7 +132,7 @@ class DigestFeed(feed.BaseFeed):
             posts_in_last_period.sort(key=lambda post: post.score(), reverse=True)
             posts_in_last_period = posts_in_last_period[: self.limit]
 
-            title = f"Issue {period_end.strftime(utils.human_strftime)}"
+            title = f"Issue {utils.human_time(period_end)}"
             value = self.post_cls(
                 version=0,
                 namespace=self.namespace,
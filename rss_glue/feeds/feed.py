@@ -8,7 +8,7 @@ from rss_glue.logger import logger
 from rss_glue.resources import global_config, utc_now
 
 
-@dataclass
+@dataclass(slots=True)
 class FeedItem:
     version: int
     namespace: str
@@ -20,15 +20,24 @@ class FeedItem:
     posted_time: datetime  # When the post was created according to the source
 
     def __post_init__(self):
-        self.logger = NamespaceLogger(logger, {"source": self})
         if type(self.discovered_time) is str:
             self.discovered_time = datetime.fromisoformat(self.discovered_time)
         if type(self.posted_time) is str:
             self.posted_time = datetime.fromisoformat(self.posted_time)
 
+    @property
+    def logger(self) -> LoggerAdapter:
+        return NamespaceLogger(logger, {"source": self})
+
     def render(self) -> str:
         raise NotImplementedError("FeedItem cannot be rendered")
 
+    def body(self) -> str:
+        """
+        The HTML of the post's own content, without surrounding details such as the author
+        """
+        return self.render()
+
     def hashkey(self):
         return hash(self.namespace + self.id)
 
@@ -62,6 +71,9 @@ class ReferenceFeedItem(FeedItem):
     def render(self):
         return self.subpost.render()
 
+    def body(self):
+        return self.subpost.body()
+
     def to_dict(self) -> dict:
         d = super().to_dict()
         d.update({"subpost": self.subpost.id})
@@ -184,6 +196,15 @@ class BaseFeed(ABC):
             self.set_last_updated()
         return global_config.cache.set(key, value, self.namespace)
 
+    def cache_set_many(self, items: dict[str, dict]):
+        """
+        Set several keys at once, only marking the feed as updated once
+        """
+        for key, value in items.items():
+            global_config.cache.set(key, value, self.namespace)
+        if items:
+            self.set_last_updated()
+
     def cache_delete(self, key: str):
         if key != "meta":
             self.set_last_updated()
@@ -192,6 +213,12 @@ class BaseFeed(ABC):
     def cache_keys(self):
         return global_config.cache.keys(self.namespace)
 
+    def cache_existing(self, keys: Iterable[str]) -> set[str]:
+        """
+        Of the given keys, return those already in the cache, listing the cache only once
+        """
+        return set(self.cache_keys()).intersection(keys)
+
 
 class ThrottleFeed(BaseFeed, ABC):
     """
@@ -1,21 +1,31 @@
+import hashlib
 import os
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
-from datetime import timedelta
+from datetime import timedelta, timezone
+from functools import lru_cache
 from typing import Optional
 from urllib.parse import urljoin
 
-import pytz
-import requests
 from instagrapi import Client
 
 from rss_glue import utils
 from rss_glue.feeds import feed
-from rss_glue.resources import global_config, utc_now
+from rss_glue.resources import global_config, http_session, http_timeout, utc_now
 
 latest_version = 5
 
 
-@dataclass
+@lru_cache(maxsize=1024)
+def _image_url(base_url: str, namespace: str, post_id: str) -> str:
+    """
+    The public URL of a post's downloaded image
+    """
+    relpath = global_config.file_cache.getRelativePath(post_id, "jpg", namespace)
+    return urljoin(base_url, relpath.as_posix())
+
+
+@dataclass(slots=True)
 class InstagramPost(feed.FeedItem):
     """
     InstagramPost represents a single Instagram post's data.
@@ -32,10 +42,7 @@ class InstagramPost(feed.FeedItem):
         """
         Generate the HTML for a post
         """
-        public_src = urljoin(
-            global_config.base_url,
-            global_config.file_cache.getRelativePath(self.id, "jpg", self.namespace).as_posix(),
-        )
+        public_src = _image_url(global_config.base_url, self.namespace, self.id)
         return f"""
         <div class="post">
             <a href="{self.origin_url}">
@@ -45,8 +52,12 @@ class InstagramPost(feed.FeedItem):
         </div>
         """
 
+    def body(self) -> str:
+        return self.post_text or ""
+
     def hashkey(self):
-        return hash(self.id + self.title)
+        # A digest rather than hash() so the key is stable across interpreter runs
+        return hashlib.blake2b(f"{self.id}\0{self.title}".encode(), digest_size=8).digest()
 
 
 class InstagramFeed(feed.ThrottleFeed):
@@ -55,6 +66,7 @@ class InstagramFeed(feed.ThrottleFeed):
     """
 
     title_max_length = 80
+    download_workers = 4
     username: str
     limit: int
     instaPath = "https://www.instagram.com/"
@@ -100,46 +112,39 @@ class InstagramFeed(feed.ThrottleFeed):
         if not self.needs_update(force):
             return
 
+        # The user id never changes and meta is persisted, so only look it up once
         user_id = self.meta.get("user_id", None)
         if not user_id:
             user_id = self.cl.user_id_from_username(self.username)
-        self.meta = {"user_id": user_id}
+            self.meta = {"user_id": user_id}
         self.logger.debug(f"found user_id {user_id}")
-        posts = self.cl.user_medias(user_id, self.limit)
+        # user_medias tries the GQL endpoint first and falls back to v1; a logged in
+        # private API client is served by v1, so ask it for a single page directly.
+        posts, _ = self.cl.user_medias_paginated_v1(user_id, self.limit)
         self.logger.debug(f"found {len(posts)} posts")
 
-        print(posts)
-
-        for i in range(min(self.limit, len(posts))):
-            post = posts[i]
-
+        posts = posts[: self.limit]
+        cached_ids = self.cache_existing(post.pk for post in posts)
+        new_posts: list[InstagramPost] = []
+        for post in posts:
             resources = post.resources
 
             image_src = str(post.thumbnail_url or resources[0].thumbnail_url)
             is_reel = post.media_type == 2
             is_multi = post.media_type == 8
             posted_time = post.taken_at
-            posted_time = posted_time.replace(tzinfo=pytz.utc)
+            posted_time = posted_time.replace(tzinfo=timezone.utc)
             post_short_id = post.pk
 
-            value = self.post(post_short_id)
-            if value:
-                self.logger.debug(f"cache hit for {value.title} {value.posted_time}")
-                continue
-
-            filename = global_config.file_cache.getPath(post_short_id, "jpg", self.namespace)
-            try:
-                r = requests.get(image_src, allow_redirects=True)
-                r.raise_for_status()
-                open(filename, "wb").write(r.content)
-            except Exception as e:
-                self.logger.error(f"{self.origin_url} could not download image: {str(e)}")
+            if post_short_id in cached_ids:
+                self.logger.debug(f"cache hit for {post_short_id} {posted_time}")
                 continue
 
             post_text = post.caption_text
-            title = f"Post by {self.author} at {posted_time.strftime(utils.human_strftime)}"
+            title = f"Post by {self.author} at {utils.human_time(posted_time)}"
             if post_text:
-                title = post_text.strip()[: self.title_max_length]
+                # Only strip the end of the short title, not the whole caption
+                title = post_text.lstrip()[: self.title_max_length].rstrip()
                 if len(post_text) > self.title_max_length:
                     title += "..."
                 title = title.replace("\n", " ")
@@ -147,7 +152,7 @@ class InstagramFeed(feed.ThrottleFeed):
             if is_reel:
                 try:
                     video_src = str(post.video_url or post.resources[0].video_url)
-                except:
+                except (AttributeError, IndexError):
                     self.logger.error(f"{self.origin_url} could not find reel video src")
                     video_src = None
 
@@ -169,10 +174,54 @@ class InstagramFeed(feed.ThrottleFeed):
                     "is_multi": is_multi,
                 }
             )
+            new_posts.append(value)
 
+        # Only keep posts whose image actually made it to disk
+        downloaded = self.download_images(new_posts)
+        new_values: dict[str, dict] = {}
+        for value in new_posts:
+            if value.id not in downloaded:
+                continue
             self.logger.info(
-                f'discovered reel={is_reel} multi={is_multi} id={post_short_id} time="{posted_time}" title="{title}"'
+                f'discovered reel={value.is_reel} multi={value.is_multi} id={value.id} time="{value.posted_time}" title="{value.title}"'
             )
-
-            self.cache_set(value.id, value.to_dict())
+            new_values[value.id] = value.to_dict()
+        self.cache_set_many(new_values)
         self.set_last_run()
+
+    def download_images(self, posts: list[InstagramPost]) -> set[str]:
+        """
+        Download the images for the given posts concurrently
+
+        :return: The ids of the posts whose image is on disk
+        """
+
+        def download(post: InstagramPost) -> Optional[str]:
+            filename = global_config.file_cache.getPath(post.id, "jpg", self.namespace)
+            # The image may already be on disk from a run that downloaded it
+            # but failed before caching the post, so don't fetch it again.
+            # Images are only moved into place once fully written, so one that
+            # exists is complete.
+            if filename.exists():
+                self.logger.debug(f"image already downloaded for {post.id}")
+                return post.id
+            try:
+                # Stream to disk rather than holding the whole image in memory. The image
+                # only takes its final name once complete, so an interrupted download
+                # never leaves a partial image behind.
+                with http_session.get(
+                    post.image_src, allow_redirects=True, stream=True, timeout=http_timeout
+                ) as r:
+                    r.raise_for_status()
+                    global_config.file_cache.write_stream(
+                        post.id, "jpg", r.iter_content(chunk_size=64 * 1024), self.namespace
+                    )
+            except Exception as e:
+                self.logger.error(f"{self.origin_url} could not download image: {str(e)}")
+                return None
+            return post.id
+
+        if not posts:
+            return set()
+        with ThreadPoolExecutor(max_workers=min(self.download_workers, len(posts))) as executor:
+            return {post_id for post_id in executor.map(download, posts) if post_id}
@@ -1,4 +1,7 @@
-from typing import Dict, Iterable
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from operator import attrgetter
+from typing import Dict, Hashable, Iterable, Optional
 
 from rss_glue.feeds import feed
 from rss_glue.resources import global_config
@@ -12,6 +15,8 @@ class MergeFeed(feed.BaseFeed):
     _sources: list[feed.BaseFeed]
     name = "merge"
     id: str
+    max_workers = 8
+    _merged: Optional[tuple[Optional[datetime], list[feed.FeedItem]]]
 
     def __init__(self, id: str, *sources: feed.BaseFeed, title: str = "Merge Feed"):
         self._sources = list(sources)
@@ -19,6 +24,7 @@ class MergeFeed(feed.BaseFeed):
         self.title = title
         self.author = "RSS Glue"
         self.origin_url = global_config.base_url
+        self._merged = None
         super().__init__()
 
     @property
@@ -35,19 +41,38 @@ class MergeFeed(feed.BaseFeed):
             self.set_last_updated(last_updated)
 
     def posts(self) -> list[feed.FeedItem]:
-        sub_posts_set: Dict[str, list[feed.FeedItem]] = {}
-        for source in self._sources:
-            for post in source.posts():
-                key = str(post.hashkey())
-                if key not in sub_posts_set:
-                    sub_posts_set[key] = [post]
-                else:
-                    self.logger.debug(f"Duplicate post: {post.title}")
-                    sub_posts_set[key].append(post)
-                    sub_posts_set[key].sort(key=lambda post: post.discovered_time)
+        # Sources bump last_updated whenever their cache changes, so the merged
+        # posts can be reused until one of them moves forward.
+        version = max((source.last_updated for source in self._sources), default=None)
+        if self._merged is not None and self._merged[0] == version:
+            self.logger.debug("reusing merged posts")
+            return list(self._merged[1])
+
+        merged = self.merge_posts()
+        self._merged = (version, merged)
+        return list(merged)
+
+    def merge_posts(self) -> list[feed.FeedItem]:
+        # Sources read their posts from disk independently, so load them in parallel
+        workers = max(1, min(self.max_workers, len(self._sources)))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            source_posts = list(executor.map(lambda source: source.posts(), self._sources))
+
+        # Of duplicate posts, keep the one that was discovered first
+        unique_posts: Dict[Hashable, feed.FeedItem] = {}
+        for posts in source_posts:
+            for post in posts:
+                key = post.hashkey()
+                existing = unique_posts.get(key)
+                if existing is None:
+                    unique_posts[key] = post
+                    continue
+                self.logger.debug(f"Duplicate post: {post.title}")
+                if post.discovered_time < existing.discovered_time:
+                    unique_posts[key] = post
 
-        sub_posts = [post[0] for post in sub_posts_set.values()]
-        sub_posts.sort(key=lambda post: post.posted_time, reverse=True)
+        sub_posts = list(unique_posts.values())
+        sub_posts.sort(key=attrgetter("posted_time"), reverse=True)
 
         return [
             feed.ReferenceFeedItem(
@@ -1,13 +1,11 @@
 import html
 from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
+from typing import Callable, Optional
 from urllib.parse import urljoin
 
-import requests
-
-from rss_glue import utils
 from rss_glue.feeds import feed
-from rss_glue.resources import utc_now
+from rss_glue.resources import http_session, http_timeout, utc_now
 
 html_template = """
 <article>
@@ -21,6 +19,40 @@ html_template = """
 """
 
 
+def _render_image(post_data: dict) -> Optional[str]:
+    return f'<img src="{post_data.get("url_overridden_by_dest")}" style="max-width: 100%; height: auto;" />'
+
+
+def _render_rich_video(post_data: dict) -> Optional[str]:
+    oembed = (post_data.get("media") or {}).get("oembed", None)
+    if not oembed:
+        return None
+    channel = oembed.get("author_name", "")
+    thumbnail = oembed.get("thumbnail_url", "")
+    return f"""<a href="{post_data.get("url")}">
+        <img src="{thumbnail}" />
+        <p>Watch on {channel}</p>
+    </a>"""
+
+
+def _render_hosted_video(post_data: dict) -> Optional[str]:
+    reddit_video = (post_data.get("media") or {}).get("reddit_video") or {}
+    fallback_url = reddit_video.get("fallback_url", None)
+    if not fallback_url:
+        return None
+    return f'<video src="{fallback_url}" controls></video>'
+
+
+# There are a few different types of reddit posts, signified by the "post_hint" field:
+# self, link, image, video, rich:video, and hosted:video. Hints without a renderer, or
+# whose renderer returns None, fall back to the selftext or a link to the post url.
+_hint_renderers: dict[str, Callable[[dict], Optional[str]]] = {
+    "image": _render_image,
+    "rich:video": _render_rich_video,
+    "hosted:video": _render_hosted_video,
+}
+
+
 @dataclass
 class RedditPost(feed.FeedItem):
     """
@@ -32,43 +64,30 @@ class RedditPost(feed.FeedItem):
     def score(self) -> float:
         return self.post_data.get("score", 1)
 
+    def body(self) -> str:
+        post_data = self.post_data
+        url = post_data.get("url")
+        html_content = None
+        renderer = _hint_renderers.get(post_data.get("post_hint", ""))
+        if renderer:
+            html_content = renderer(post_data)
+        if html_content is None:
+            # Posts cached before the decoded selftext was stored only have the escaped form
+            selftext_html = post_data.get("selftext_html_decoded", None)
+            if selftext_html is None and post_data.get("selftext_html"):
+                selftext_html = html.unescape(post_data["selftext_html"])
+            if selftext_html:
+                html_content = selftext_html
+            else:
+                html_content = f'<a href="{url}">{url}</a>'
+        return html_content
+
     def render(self):
-        # There are a few different types of reddit posts, signified by the "post_hint" field
-        # self, link, image, video, rich:video, and hosted:video
-        url = self.post_data.get("url")
-        selftext_html = self.post_data.get("selftext_html", None)
         comments_url = urljoin("https://www.reddit.com", self.post_data.get("permalink", ""))
-        html_content = f'<a href="{url}">{url}</a>'
-
-        if selftext_html:
-            html_content = html.unescape(selftext_html)
-
-        if self.post_data.get("post_hint", None):
-            if self.post_data.get("post_hint") == "image":
-                html_content = f'<img src="{self.post_data.get("url_overridden_by_dest")}" style="max-width: 100%; height: auto;" />'
-            elif self.post_data.get("post_hint") == "rich:video":
-                oembed = self.post_data.get("media", {}).get("oembed", None)
-                if oembed:
-                    channel = oembed.get("author_name", "")
-                    thumbnail = oembed.get("thumbnail_url", "")
-                    html_content = f"""<a href="{url}">
-                        <img src="{thumbnail}" />
-                        <p>Watch on {channel}</p>
-                    </a>"""
-            elif self.post_data.get("post_hint") == "hosted:video":
-                fallback_url = (
-                    self.post_data.get("media", {})
-                    .get("reddit_video", {})
-                    .get("fallback_url", None)
-                )
-                if fallback_url:
-                    html_content = f'<video src="{fallback_url}" controls></video>'
-
         return html_template.format(
             author=self.author,
-            posted_time=self.posted_time.strftime(utils.human_strftime),
             score=self.score(),
-            content=html_content,
+            content=self.body(),
             comments_url=comments_url,
         )
 
@@ -105,15 +124,24 @@ class RedditFeed(feed.ThrottleFeed):
         # Fetch the posts from the Reddit API
         # and store them in the cache
 
-        response = requests.get(self.url)
+        response = http_session.get(self.url, timeout=http_timeout)
         response.raise_for_status()
         posts = response.json().get("data", {}).get("children", [])
+        # Every post found in this run is discovered at the same time
+        now = utc_now()
+        existing = self.cache_existing(post.get("data", {}).get("id") for post in posts)
         for post in posts:
             post_data = post.get("data", {})
             post_id = post_data.get("id")
-            if self.cache_get(post_id):
+            if post_id in existing:
                 continue
 
+            # Reddit escapes selftext_html, so decode it once here rather than on every render
+            selftext_html = post_data.get("selftext_html")
+            post_data["selftext_html_decoded"] = (
+                html.unescape(selftext_html) if selftext_html else None
+            )
+
             created_time_epoch = post_data.get("created_utc")
             created_time = datetime.fromtimestamp(created_time_epoch, tz=timezone.utc)
             permalink = urljoin("https://www.reddit.com", post_data.get("permalink", ""))
@@ -125,7 +153,7 @@ class RedditFeed(feed.ThrottleFeed):
                 author=post_data.get("author"),
                 title=post_data.get("title"),
                 posted_time=created_time,
-                discovered_time=utc_now(),
+                discovered_time=now,
                 origin_url=permalink,
             )
             self.logger.info(f"Adding post {value.id}")
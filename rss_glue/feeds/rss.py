@@ -1,12 +1,11 @@
 from dataclasses import dataclass
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from typing import Optional
 
 import feedparser
-import pytz
 
 from rss_glue.feeds import feed
-from rss_glue.resources import short_hash_string, utc_now
+from rss_glue.resources import http_session, http_timeout, short_hash_string, utc_now
 
 
 @dataclass
@@ -16,14 +15,15 @@ class RssPost(feed.FeedItem):
     def render(self) -> str:
         entry = self.feedparser_parsed
         content = entry.get("content", [])
-        html_content = ""
+        parts: list[str] = []
 
         for c in content:
             content_type = c.get("type", "text/plain")
             if content_type == "text/plain":
-                html_content += f"<p>{c.get('value')}</p>"
+                parts.append(f"<p>{c.get('value')}</p>")
             else:
-                html_content += c.get("value")
+                parts.append(c.get("value"))
+        html_content = "".join(parts)
 
         # For some reason, reddit likes to structure posts with <tables>
         # so we need to strip them out
@@ -61,7 +61,26 @@ class RssFeed(feed.ThrottleFeed):
         if not self.needs_update(force):
             return
 
-        f = feedparser.parse(self.url)
+        # Make a conditional request so an unchanged feed isn't downloaded and parsed again,
+        # unless the update is forced
+        meta = self.meta
+        request_headers = {}
+        if not force and meta.get("etag"):
+            request_headers["If-None-Match"] = meta["etag"]
+        if not force and meta.get("last_modified"):
+            request_headers["If-Modified-Since"] = meta["last_modified"]
+        response = http_session.get(self.url, headers=request_headers, timeout=http_timeout)
+        response.raise_for_status()
+        if response.status_code == 304:
+            self.logger.debug("   feed not modified")
+            self.set_last_run()
+            return
+
+        # feedparser expects lowercase header names, and resolves relative
+        # links against content-location, which it would have set itself
+        headers = {key.lower(): value for key, value in response.headers.items()}
+        headers.setdefault("content-location", response.url)
+        f = feedparser.parse(response.content, response_headers=headers)
         self.title = getattr(f.feed, "title", "RSS Feed")
         self.author = getattr(f.feed, "author", "RSS Glue")
         self.origin_url = getattr(f.feed, "link", self.url)
@@ -72,16 +91,14 @@ class RssFeed(feed.ThrottleFeed):
         }
 
         self.logger.debug(f"   found {len(f.entries)} posts")
-        for entry in f.entries[: self.limit]:
-            # The post ID might be an unsafe string, so we hash it
-            # to make it safe for use as a filename
-            id = getattr(entry, "id")
-            post_id = short_hash_string(id)
-            # Load the post from the cache
-            post = self.cache_get(post_id)
-
+        entries = f.entries[: self.limit]
+        # The post ID might be an unsafe string, so we hash it
+        # to make it safe for use as a filename
+        post_ids = [short_hash_string(getattr(entry, "id")) for entry in entries]
+        existing = self.cache_existing(post_ids)
+        for entry, post_id in zip(entries, post_ids):
             # If the post is already in the cache, skip it
-            if post:
+            if post_id in existing:
                 self.logger.debug(f"   cache hit {post_id}")
                 continue
 
@@ -90,7 +107,7 @@ class RssFeed(feed.ThrottleFeed):
             except:
                 published_at_tuple = getattr(entry, "published_parsed", None)
                 if published_at_tuple:
-                    published_at = datetime(*published_at_tuple[:6], tzinfo=pytz.utc)  # type: ignore
+                    published_at = datetime(*published_at_tuple[:6], tzinfo=timezone.utc)  # type: ignore
 
             title = getattr(entry, "title", "RSS Post")
             value = self.post_cls(
@@ -107,6 +124,12 @@ class RssFeed(feed.ThrottleFeed):
             self.logger.info(f"   new post {post_id} {title}")
             self.cache_set(post_id, value.to_dict())
 
+        # Only remember the validators once every entry is cached, so a failed
+        # run isn't answered with "not modified" next time
+        self.meta = {
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+        }
         self.set_last_run()
 
     def post(self, post_id: str) -> Optional[feed.FeedItem]:
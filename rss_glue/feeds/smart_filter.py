@@ -1,6 +1,10 @@
+import heapq
+import html
+import re
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from datetime import datetime
-from html.parser import HTMLParser
+from operator import attrgetter
 from typing import Iterable, Optional, cast
 
 from rss_glue.feeds import ai_client, feed
@@ -22,17 +26,62 @@ Is this content relevent? Say 'yes' if the post is relevant, 'no' if it is not.
 Don't say anything else.
 """
 
+batch_prompt = """
+Please take a look at the following {count} bits of content from an RSS feed:
+{posts}
+Decide if each post above is relevent based on the criteria expressed below:
 
-class HTMLFilter(HTMLParser):
-    """
-    A simple no deps HTML -> TEXT converter.
-    @see https://stackoverflow.com/a/55825140
-    """
+"{prompt}"
 
-    text = ""
+Is each post relevent? Answer with one line per post, giving the post number followed by
+'yes' if the post is relevant or 'no' if it is not, like this:
 
-    def handle_data(self, data):
-        self.text += data
+1: yes
+2: no
+
+Don't say anything else.
+"""
+
+batch_post_template = """
+### Post {index}
+Title: {title}
+Author: {author}
+URL: {url}
+Posted time: {posted_time}
+Content: {content}
+"""
+
+batch_answer_re = re.compile(r"^\s*(\d+)\s*[:.\-]\s*(yes|no)\b", re.IGNORECASE | re.MULTILINE)
+
+tag_re = re.compile(r"<[^>]+>")
+whitespace_re = re.compile(r"\s+")
+
+
+def _html_to_text(fragment: str) -> str:
+    # Strip tags before unescaping so escaped markup stays in the text
+    text = html.unescape(tag_re.sub(" ", fragment))
+    return whitespace_re.sub(" ", text).strip()
+
+
+def _strip_html(rendered: str, limit: int) -> str:
+    """
+    Convert rendered post HTML to at most limit characters of plain text
+    """
+    # Convert the post in growing chunks, each ending after a tag, and stop once there
+    # is enough text, so a huge post costs about as much as the limit rather than its size
+    parts: list[str] = []
+    length = 0
+    start = 0
+    window = limit * 4
+    while start < len(rendered) and length <= limit:
+        end = rendered.find(">", start + window) + 1 or len(rendered)
+        text = _html_to_text(rendered[start:end])
+        if text:
+            parts.append(text)
+            length += len(text) + 1
+        start = end
+        window *= 2
+    return " ".join(parts)[:limit]
 
 
 @dataclass
@@ -62,9 +111,17 @@ class AiFilterFeed(feed.BaseFeed):
         content_limit: int = 1000,
         limit: int = -1,
         title: Optional[str] = None,
+        batch_size: int = 1,
+        concurrency: int = 4,
+        min_chars: int = 0,
     ):
+        if min_chars > content_limit:
+            raise ValueError("min_chars cannot be more than content_limit")
         self.source = source
         self.limit = limit
+        self.batch_size = max(batch_size, 1)
+        self.concurrency = max(concurrency, 1)
+        self.min_chars = min_chars
         self.prompt = prompt
         self.client = client
 
@@ -87,23 +144,79 @@ class AiFilterFeed(feed.BaseFeed):
             return None
         return self.post_cls(**self.post_cls.load(cached, self.source))
 
+    def prompt_fields(self, post: feed.FeedItem) -> dict:
+        return {
+            "title": post.title,
+            "author": post.author,
+            "content": _strip_html(post.render(), self.content_limit),
+            "url": post.origin_url,
+            "posted_time": post.posted_time.strftime("%Y-%m-%d %H:%M %Z"),
+        }
+
     def format_prompt(self, post: feed.FeedItem) -> str:
-        f = HTMLFilter()
-        f.feed(post.render())
-
-        return base_prompt.format(
-            title=post.title,
-            author=post.author,
-            content=f.text[: self.content_limit],
-            url=post.origin_url,
-            posted_time=post.posted_time.strftime("%Y-%m-%d %H:%M %Z"),
+        return base_prompt.format(prompt=self.prompt, **self.prompt_fields(post))
+
+    def format_batch_prompt(self, posts: list[feed.FeedItem]) -> str:
+        return batch_prompt.format(
+            count=len(posts),
+            posts="".join(
+                batch_post_template.format(index=index, **self.prompt_fields(post))
+                for index, post in enumerate(posts, start=1)
+            ),
             prompt=self.prompt,
         )
 
+    def check_post(self, post: feed.FeedItem) -> tuple[feed.FeedItem, bool, int]:
+        """
+        Ask the AI backend whether a single post should be included
+
+        :return: The post, whether to include it, and the tokens used
+        """
+        msg = self.client.get_response(self.format_prompt(post))
+        include_post = False
+        if "yes" in msg.response.lower():
+            include_post = True
+        elif "no" in msg.response.lower():
+            include_post = False
+        else:
+            self.logger.error(f"Invalid response: {msg.response}")
+        return post, include_post, msg.tokens_used
+
+    def check_batch(self, posts: list[feed.FeedItem]) -> list[tuple[feed.FeedItem, bool, int]]:
+        """
+        Ask the AI backend about several posts with one prompt, so the instructions
+        are only sent once. Posts missing from the answer are checked on their own.
+        """
+        if len(posts) == 1:
+            return [self.check_post(posts[0])]
+
+        msg = self.client.get_response(self.format_batch_prompt(posts))
+        answers = {
+            int(match.group(1)): match.group(2).lower() == "yes"
+            for match in batch_answer_re.finditer(msg.response)
+        }
+        # The backend only reports usage for the whole batch, so share it out evenly
+        token_cost = msg.tokens_used // len(posts)
+        results = []
+        for index, post in enumerate(posts, start=1):
+            if index in answers:
+                results.append((post, answers[index], token_cost))
+            else:
+                self.logger.error(f"No answer for post={post.id} in batch, checking it alone")
+                results.append(self.check_post(post))
+        return results
+
     def posts(self) -> list[feed.FeedItem]:
-        source_posts = self.source.posts()
-        posts = [self.post(post.id) for post in source_posts]
-        return [post for post in posts if post and post.include_post]
+        posts: list[feed.FeedItem] = []
+        for source_post in self.source.posts():
+            cached = self.cache_get(source_post.id)
+            # Check the raw result first so excluded posts are never built
+            if not cached or not cached.get("include_post"):
+                continue
+            # The subpost is already in hand, so don't look it up in the source again
+            cached["subpost"] = source_post
+            posts.append(self.post_cls(**cached))
+        return posts
 
     def cleanup(self) -> None:
         cache_posts = cast(list[AiFilterPost], super().posts())
@@ -116,7 +229,7 @@ class AiFilterFeed(feed.BaseFeed):
                 )
                 self.cache_delete(post.id)
             # Remove posts that wouldn't be included anymore
-            if post.id not in source_post_keys:
+            elif post.id not in source_post_keys:
                 self.logger.info(
                     f"cleanup: removing {post.id} because it is no longer in the source"
                 )
@@ -131,41 +244,63 @@ class AiFilterFeed(feed.BaseFeed):
         This feed only updates when the source feed updates
         """
         source_posts = self.source.posts()
-        # Sort by posted_time
-        source_posts.sort(key=lambda post: post.posted_time, reverse=True)
-        # Limit to the user specified limit
+        # Newest first, limited to the user specified limit
         if self.limit != -1:
-            source_posts = source_posts[: self.limit]
+            source_posts = heapq.nlargest(self.limit, source_posts, key=attrgetter("posted_time"))
+        else:
+            source_posts.sort(key=attrgetter("posted_time"), reverse=True)
         # Figure out which ones we haven't tested yet
 
+        pending: list[feed.FeedItem] = []
+        # Write results a batch at a time, rather than marking the feed as updated for each post
+        new_values: dict[str, dict] = {}
         for source_post in source_posts:
             post = self.post(source_post.id)
             if post:
                 self.logger.debug(f" skipping filter check for {source_post.id}")
                 continue
+            if self.min_chars and self.too_short(source_post):
+                # There's nothing to judge, so don't pay for a request
+                value = self.result(source_post, include_post=False, token_cost=0)
+                new_values[value.id] = value.to_dict()
+                continue
+            pending.append(source_post)
+        self.cache_set_many(new_values)
 
-            msg = self.client.get_response(self.format_prompt(source_post))
+        if pending:
+            batches = [
+                pending[i : i + self.batch_size] for i in range(0, len(pending), self.batch_size)
+            ]
+            # Each check is a round trip to the AI backend, so keep several in flight.
+            # Each batch is cached as soon as it's answered, so a failure part way
+            # through doesn't lose the requests that were already paid for.
+            with ThreadPoolExecutor(max_workers=min(self.concurrency, len(batches))) as executor:
+                for results in executor.map(self.check_batch, batches):
+                    new_values = {}
+                    for source_post, include_post, token_cost in results:
+                        value = self.result(source_post, include_post, token_cost)
+                        new_values[value.id] = value.to_dict()
+                    self.cache_set_many(new_values)
 
-            include_post = False
-            if "yes" in msg.response.lower():
-                include_post = True
-            elif "no" in msg.response.lower():
-                include_post = False
-            else:
-                self.logger.error(f"Invalid response: {msg.response}")
-
-            value = self.post_cls(
-                version=0,
-                namespace=self.namespace,
-                id=source_post.id,
-                author=source_post.author,
-                origin_url=source_post.origin_url,
-                title=source_post.title,
-                discovered_time=source_post.discovered_time,
-                posted_time=source_post.posted_time,
-                subpost=source_post,
-                token_cost=msg.tokens_used,
-                include_post=include_post,
-            )
-            self.logger.info(f"post={source_post.id} include_post={include_post}")
-            self.cache_set(value.id, value.to_dict())
+    def too_short(self, post: feed.FeedItem) -> bool:
+        # Only count the post's own text, not details like the author that every post has
+        return len(_strip_html(post.body(), self.content_limit)) < self.min_chars
+
+    def result(
+        self, source_post: feed.FeedItem, include_post: bool, token_cost: int
+    ) -> AiFilterPost:
+        value = self.post_cls(
+            version=0,
+            namespace=self.namespace,
+            id=source_post.id,
+            author=source_post.author,
+            origin_url=source_post.origin_url,
+            title=source_post.title,
+            discovered_time=source_post.discovered_time,
+            posted_time=source_post.posted_time,
+            subpost=source_post,
+            token_cost=token_cost,
+            include_post=include_post,
+        )
+        self.logger.info(f"post={source_post.id} include_post={include_post}")
+        return value
@@ -1,9 +1,63 @@
+import hashlib
+import os
 from abc import ABC, abstractmethod
-from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from itertools import chain
+from operator import attrgetter
 from pathlib import Path
-from typing import Iterable, Tuple
+from typing import Callable, Iterable, Optional, Tuple
 
-from rss_glue.feeds.feed import BaseFeed
+from rss_glue.feeds.feed import BaseFeed, FeedItem, ReferenceFeedItem
+from rss_glue.resources import global_config, utc_now
+
+
+class RenderedPosts:
+    """
+    Rendered post HTML for a single generation pass, keyed by the namespace and id of the post
+    """
+
+    def __init__(self):
+        self._html: dict[Tuple[str, str], str] = {}
+
+    def render(self, post: FeedItem) -> str:
+        """
+        Render a post, reusing the HTML if another artifact already rendered it this pass
+        """
+        # A plain reference renders exactly as the post it points to, so share that entry
+        while (
+            isinstance(post, ReferenceFeedItem)
+            and type(post).render is ReferenceFeedItem.render
+            and post.subpost
+        ):
+            post = post.subpost
+        key = (post.namespace, post.id)
+        html = self._html.get(key)
+        if html is None:
+            html = self._html[key] = post.render()
+        return html
+
+
+def posts_digest(source: BaseFeed, posts: Iterable[FeedItem]) -> str:
+    """
+    Summarize what an artifact of the source would be generated from, so that
+    an artifact whose inputs haven't changed doesn't need to be generated again
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(f"{source.title}\0{source.author}\0{source.origin_url}".encode())
+    # Sources don't list their posts in a stable order, so sort them to get a stable digest
+    for post in sorted(posts, key=attrgetter("posted_time", "id")):
+        digest.update(
+            f"\0{post.namespace}\0{post.id}\0{post.title}\0{post.posted_time.isoformat()}".encode()
+        )
+    return digest.hexdigest()
+
+
+def read_digest(path: Path) -> Optional[str]:
+    try:
+        return path.read_text()
+    except FileNotFoundError:
+        return None
 
 
 class Artifact(ABC):
@@ -12,14 +66,82 @@ class Artifact(ABC):
     """
 
     sources: list[BaseFeed]
+    max_workers = 4
 
     def __init__(self, *sources: BaseFeed):
         self.sources = list(sources)
 
     @abstractmethod
-    def generate(self) -> Iterable[Tuple[Path, datetime]]:
+    def generate(self, rendered: Optional[RenderedPosts] = None) -> Iterable[Tuple[Path, datetime]]:
+        """
+        :param rendered: Posts rendered so far in this generation pass, to share between
+            artifacts. Without it, posts are only shared within this artifact.
+        """
         pass
 
+    def generate_sources(
+        self,
+        ext: str,
+        namespace: str,
+        write: Callable[[BaseFeed, list[FeedItem], RenderedPosts], None],
+        rendered: Optional[RenderedPosts],
+    ) -> Iterable[Tuple[Path, datetime]]:
+        """
+        Generate a file for each source, skipping those whose posts haven't changed
+
+        :param ext: The extension of the generated files
+        :param namespace: The directory the generated files go in
+        :param write: Writes the file for a source, given its posts and the rendered posts
+        :param rendered: Posts rendered so far in this generation pass
+        """
+        if rendered is None:
+            rendered = RenderedPosts()
+        # Everything generated in this pass is stamped with the same time
+        now = utc_now()
+        # Each source is generated independently, so overlap their reads, renders and writes
+        workers = max(1, min(self.max_workers, len(self.sources)))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            yield from executor.map(
+                lambda source: self.generate_source(source, ext, namespace, write, rendered, now),
+                self.sources,
+            )
+
+    def generate_source(
+        self,
+        source: BaseFeed,
+        ext: str,
+        namespace: str,
+        write: Callable[[BaseFeed, list[FeedItem], RenderedPosts], None],
+        rendered: RenderedPosts,
+        now: datetime,
+    ) -> Tuple[Path, datetime]:
+        file_to_generate = global_config.file_cache.getPath(source.namespace, ext, namespace)
+        relpath = global_config.file_cache.getRelativePath(source.namespace, ext, namespace)
+        try:
+            last_modified = datetime.fromtimestamp(
+                os.stat(file_to_generate).st_mtime, tz=timezone.utc
+            )
+        except FileNotFoundError:
+            last_modified = None
+        # If the source has updated since the mtime of the file, regenerate
+        if last_modified and last_modified >= source.last_updated:
+            return relpath, last_modified
+
+        posts = source.posts()
+
+        # The source may have updated without changing anything in the file.
+        # Digests are kept apart from the generated files, which are published.
+        digest = posts_digest(source, posts)
+        digest_namespace = f"{namespace}_digests"
+        digest_path = global_config.file_cache.getPath(source.namespace, "hash", digest_namespace)
+        if last_modified and read_digest(digest_path) == digest:
+            os.utime(file_to_generate)
+            return relpath, last_modified
+
+        write(source, posts, rendered)
+        global_config.file_cache.write(source.namespace, "hash", digest, digest_namespace)
+        return relpath, now
+
 
 class MetaArtifact(Artifact, ABC):
     """
@@ -30,7 +152,4 @@ class MetaArtifact(Artifact, ABC):
 
     def __init__(self, *artifacts: Artifact):
         self.artifacts = list(artifacts)
-        sources = []
-        for artifact in artifacts:
-            sources.extend(artifact.sources)
-        super().__init__(*sources)
+        super().__init__(*chain.from_iterable(artifact.sources for artifact in artifacts))
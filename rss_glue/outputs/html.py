@@ -1,14 +1,14 @@
 from datetime import datetime
+from itertools import chain
+from operator import attrgetter
 from pathlib import Path
-from typing import Iterable, Tuple
-
-import pytz
+from typing import Iterable, Optional, Tuple
 
 from rss_glue import utils
 from rss_glue.feeds import feed
 from rss_glue.logger import logger
 from rss_glue.outputs import artifact
-from rss_glue.resources import global_config, utc_now
+from rss_glue.resources import global_config
 
 page_template = """
 <!DOCTYPE html>
@@ -45,42 +45,50 @@ post_template = """
             </section>
 """
 
+# The page is written around its posts, so split it where they go
+page_prefix, page_suffix = page_template.split("{content}")
+
 
 class HtmlOutput(artifact.Artifact):
 
-    def generate(self) -> Iterable[Tuple[Path, datetime]]:
+    def generate(
+        self, rendered: Optional[artifact.RenderedPosts] = None
+    ) -> Iterable[Tuple[Path, datetime]]:
         """
         Generate a single HTML page with all the posts from the sources
         """
-        for source in self.sources:
-            file_to_generate = global_config.file_cache.getPath(source.namespace, "html", "html")
-            relpath = global_config.file_cache.getRelativePath(source.namespace, "html", "html")
-            # If the source has updated since the mtime of the file, regenerate
-            if file_to_generate.exists():
-                last_modified = datetime.fromtimestamp(
-                    file_to_generate.stat().st_mtime,
-                    tz=pytz.utc,
-                )
-                if last_modified >= source.last_updated:
-                    yield relpath, last_modified
-                    continue
+        return self.generate_sources("html", "html", self.write_page, rendered)
 
-            posts = source.posts()
-            posts = sorted(posts, key=lambda x: x.posted_time, reverse=True)
+    def write_page(
+        self,
+        source: feed.BaseFeed,
+        posts: list[feed.FeedItem],
+        rendered: artifact.RenderedPosts,
+    ):
+        """
+        Write the HTML page for a single source
+        """
+        posts.sort(key=attrgetter("posted_time"), reverse=True)
 
-            html = ""
-            for post in posts:
-                html += post_template.format(
+        # Write each post as it's rendered rather than building the whole page in memory
+        chunks = chain(
+            [
+                page_prefix.format(
+                    title=source.title,
+                    author=source.author,
+                    origin_url=source.origin_url,
+                    css=utils.page_css,
+                )
+            ],
+            (
+                post_template.format(
                     title=post.title,
-                    content=post.render(),
-                    posted_time=post.posted_time.strftime(utils.human_strftime),
+                    content=rendered.render(post),
+                    posted_time=utils.human_time(post.posted_time),
                     origin_url=post.origin_url,
                 )
-            html = page_template.format(
-                title=source.title,
-                author=source.author,
-                origin_url=source.origin_url,
-                content=html,
-                css=utils.page_css,
-            )
-            yield global_config.file_cache.write(source.namespace, "html", html, "html"), utc_now()
+                for post in posts
+            ),
+            [page_suffix],
+        )
+        global_config.file_cache.write_chunks(source.namespace, "html", chunks, "html")
@@ -1,10 +1,10 @@
 from datetime import datetime
 from pathlib import Path
-from typing import Iterable, Tuple
-from urllib.parse import urljoin
+from typing import Iterable, Optional, Tuple
 
 from rss_glue.feeds import feed
 from rss_glue.outputs import artifact
+from rss_glue.outputs.artifact import RenderedPosts
 from rss_glue.resources import global_config, utc_now
 from rss_glue.utils import page_css
 
@@ -40,19 +40,26 @@ link_template = """
 
 class HTMLIndexOutput(artifact.MetaArtifact):
 
-    def generate(self) -> Iterable[Tuple[Path, datetime]]:
+    def generate(self, rendered: Optional[RenderedPosts] = None) -> Iterable[Tuple[Path, datetime]]:
 
-        html = ""
+        # Let the artifacts share the posts they render
+        if rendered is None:
+            rendered = RenderedPosts()
+        # base_url always ends in a slash and artifact paths are relative, so join by concatenation
+        base_url = global_config.base_url
+        parts: list[str] = []
         for artifact in self.artifacts:
-            html += f"<h2>{artifact.__class__.__name__}</h2>"
-            for relpath, modified in artifact.generate():
-                actualPath = urljoin(global_config.base_url, relpath.as_posix())
-                html += link_template.format(
-                    url=actualPath,
+            parts.append(f"<h2>{artifact.__class__.__name__}</h2>")
+            for relpath, modified in artifact.generate(rendered):
+                actualPath = base_url + relpath.as_posix()
+                parts.append(
+                    link_template.format(
+                        url=actualPath,
+                    )
                 )
                 yield relpath, modified
         html = page_template.format(
-            content=html,
+            content="".join(parts),
             css=page_css,
         )
 
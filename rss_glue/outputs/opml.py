@@ -1,9 +1,8 @@
 from datetime import datetime
 from pathlib import Path
-from typing import Iterable, Tuple
-from urllib.parse import urljoin
+from typing import Iterable, Optional, Tuple
 
-from rss_glue.outputs.artifact import MetaArtifact
+from rss_glue.outputs.artifact import MetaArtifact, RenderedPosts
 from rss_glue.resources import global_config, utc_now
 
 opml_template = """<?xml version="1.0" encoding="UTF-8"?>
@@ -27,12 +26,17 @@ outline_template = """
 
 class OpmlOutput(MetaArtifact):
 
-    def generate(self) -> Iterable[Tuple[Path, datetime]]:
+    def generate(self, rendered: Optional[RenderedPosts] = None) -> Iterable[Tuple[Path, datetime]]:
 
+        # Let the artifacts share the posts they render
+        if rendered is None:
+            rendered = RenderedPosts()
+        # base_url always ends in a slash and artifact paths are relative, so join by concatenation
+        base_url = global_config.base_url
         outlines = []
         for artifact in self.artifacts:
-            for relpath, modified in artifact.generate():
-                actualPath = urljoin(global_config.base_url, relpath.as_posix())
+            for relpath, modified in artifact.generate(rendered):
+                actualPath = base_url + relpath.as_posix()
                 outlines.append(
                     outline_template.format(
                         title=relpath.stem,
@@ -40,9 +44,10 @@ class OpmlOutput(MetaArtifact):
                     )
                 )
                 yield relpath, modified
+        now = utc_now()
         xml = opml_template.format(
             content="\n".join(outlines),
             title="RSS Glue Feeds",
-            date_created=utc_now().isoformat(),
+            date_created=now.isoformat(),
         )
-        yield global_config.file_cache.write("opml", "xml", xml, "opml"), utc_now()
+        yield global_config.file_cache.write("opml", "xml", xml, "opml"), now
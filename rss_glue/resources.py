@@ -10,12 +10,23 @@ import zipfile
 from pathlib import Path
 from typing import Any, Callable
 
+import requests
+
 from rss_glue.cache import FileCache, JsonCache, SimpleCache
 from rss_glue.logger import logger
 
 if typing.TYPE_CHECKING:
     from rss_glue.outputs.artifact import Artifact
 
+user_agent = "rss-glue/0.1.0 (+https://github.com/subdavis/rss-glue)"
+
+# Shared by every feed so fetches reuse pooled, kept-alive connections.
+# Some sites, such as Reddit, throttle generic client user agents, so identify ourselves.
+http_session = requests.Session()
+http_session.headers["User-Agent"] = user_agent
+# requests waits forever by default, so every fetch passes this to give up on a stalled server
+http_timeout = 10
+
 
 def utc_now():
     return datetime.datetime.now(tz=datetime.timezone.utc)
@@ -25,7 +36,8 @@ def short_hash_string(string):
     """
     Return a SHA-256 hash of the given string
     """
-    return hashlib.sha256(string.encode("utf-8")).hexdigest()[:16]
+    # Same value as hexdigest()[:16], without building the full 64 character digest
+    return hashlib.sha256(string.encode("utf-8")).digest()[:8].hex()
 
 
 class Config:
@@ -1,7 +1,25 @@
 import random
+from datetime import datetime, timedelta
+from functools import lru_cache
+from typing import Optional
 
 human_strftime = "%a, %b %d %I:%M %p"
 
+
+@lru_cache(maxsize=4096)
+def _human_time(value: datetime, offset: Optional[timedelta]) -> str:
+    return value.strftime(human_strftime)
+
+
+def human_time(value: datetime) -> str:
+    """
+    Format a datetime with human_strftime, remembering the result since the same
+    post times are formatted again for every output that includes them
+    """
+    # Equal datetimes in different timezones have different wall times, so key on the offset too
+    return _human_time(value, value.utcoffset())
+
+
 # CSS should be a 500 pixel wide central column
 page_css = """
 body {